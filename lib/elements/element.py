@@ -3,8 +3,12 @@
 # Copyright (c) 2010 Authors
 # Licensed under the GNU GPL version 3.0 or later.  See the file LICENSE for details.
 
+import math
 import sys
-from copy import deepcopy
+from collections import OrderedDict
+from copy import copy
+from functools import cached_property
+from operator import itemgetter
 import numpy as np
 
 import inkex
@@ -16,7 +20,24 @@ from ..patterns import apply_patterns
 from ..svg import (PIXELS_PER_MM, apply_transforms, convert_length,
                    get_node_transform)
 from ..svg.tags import INKSCAPE_LABEL, INKSTITCH_ATTRIBS
-from ..utils import Point, cache
+from ..utils import cache
+
+# picks the on-curve point out of a (control_before, point, control_after) tuple
+_csp_point = itemgetter(1)
+
+# Parsed d strings shared between all elements.  Elements get recreated
+# often (e.g. for every update of the params preview) while their geometry
+# rarely changes, and the same d string often shows up under different
+# transforms, e.g. repeated glyphs in lettering or clones.  The cached
+# superpaths must be treated as read-only, see EmbroideryElement.path.
+_PATH_CACHE = OrderedDict()
+_PATH_CACHE_SIZE = 1024
+
+# strings that get_boolean_param() accepts as True (compared in lower case)
+_TRUE_VALUES = frozenset(('yes', 'y', 'true', 't', '1'))
+
+# sentinel for the parameter caches, None and "" are valid cached values
+_MISSING = object()
 
 
 class Param(object):
@@ -55,12 +76,18 @@ class EmbroideryElement(object):
     def __init__(self, node):
         self.node = node
 
+        # Parameter lookups are very frequent, so we keep plain dicts per
+        # instance instead of going through the lru_cache decorator.
+        self._param_cache = {}
+        self._boolean_param_cache = {}
+        self._float_param_cache = {}
+        self._int_param_cache = {}
+
         # update legacy embroider_ attributes to namespaced attributes
-        legacy_attribs = False
-        for attrib in self.node.attrib:
-            if attrib.startswith('embroider_'):
-                self.replace_legacy_param(attrib)
-                legacy_attribs = True
+        # (collect them first, replace_legacy_param() deletes attributes)
+        legacy_attribs = [attrib for attrib in self.node.attrib if attrib.startswith('embroider_')]
+        for attrib in legacy_attribs:
+            self.replace_legacy_param(attrib)
         # convert legacy tie setting
         legacy_tie = self.get_param('ties', None)
         if legacy_tie == "True":
@@ -78,14 +105,21 @@ class EmbroideryElement(object):
 
     @classmethod
     def get_params(cls):
-        params = []
-        for attr in dir(cls):
-            prop = getattr(cls, attr)
-            if isinstance(prop, property):
-                # The 'param' attribute is set by the 'param' decorator defined above.
-                if hasattr(prop.fget, 'param'):
-                    params.append(prop.fget.param)
-        return params
+        # The params are defined by the class, so we only need to collect them
+        # once.  Look in cls.__dict__ so that subclasses don't pick up the
+        # cached params of their parent.
+        params = cls.__dict__.get('_params')
+        if params is None:
+            params = []
+            for attr in dir(cls):
+                prop = getattr(cls, attr)
+                if isinstance(prop, property):
+                    # The 'param' attribute is set by the 'param' decorator defined above.
+                    if hasattr(prop.fget, 'param'):
+                        params.append(prop.fget.param)
+            params = tuple(params)
+            cls._params = params
+        return list(params)
 
     def replace_legacy_param(self, param):
         # remove "embroider_" prefix
@@ -95,45 +129,59 @@ class EmbroideryElement(object):
             self.set_param(param[10:], value)
         del self.node.attrib[param]
 
-    @cache
     def get_param(self, param, default):
-        value = self.node.get(INKSTITCH_ATTRIBS[param], "").strip()
+        value = self._param_cache.get(param, _MISSING)
+        if value is _MISSING:
+            value = self.node.get(INKSTITCH_ATTRIBS[param], "").strip()
+            self._param_cache[param] = value
         return value or default
 
-    @cache
     def get_boolean_param(self, param, default=None):
+        key = (param, default)
+        value = self._boolean_param_cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
         value = self.get_param(param, default)
+        if not isinstance(value, bool):
+            # params are usually written in lower case, so try that first
+            value = value and (value in _TRUE_VALUES or value.lower() in _TRUE_VALUES)
 
-        if isinstance(value, bool):
-            return value
-        else:
-            return value and (value.lower() in ('yes', 'y', 'true', 't', '1'))
+        self._boolean_param_cache[key] = value
+        return value
 
-    @cache
     def get_float_param(self, param, default=None):
+        key = (param, default)
+        value = self._float_param_cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
         try:
             value = float(self.get_param(param, default))
         except (TypeError, ValueError):
             value = default
 
-        if value is None:
-            return value
-
-        if param.endswith('_mm'):
+        if value is not None and param.endswith('_mm'):
             value = value * PIXELS_PER_MM
 
+        self._float_param_cache[key] = value
         return value
 
-    @cache
     def get_int_param(self, param, default=None):
+        key = (param, default)
+        value = self._int_param_cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
         try:
             value = int(self.get_param(param, default))
         except (TypeError, ValueError):
-            return default
-
-        if param.endswith('_mm'):
-            value = int(value * PIXELS_PER_MM)
+            value = default
+        else:
+            if param.endswith('_mm'):
+                value = int(value * PIXELS_PER_MM)
 
+        self._int_param_cache[key] = value
         return value
 
     # returns 2 float values as a numpy array
@@ -165,6 +213,15 @@ class EmbroideryElement(object):
     def set_param(self, name, value):
         param = INKSTITCH_ATTRIBS[name]
         self.node.set(param, str(value))
+        self._clear_param_caches()
+
+    def _clear_param_caches(self):
+        # The typed caches are keyed by (param, default), so it's simplest
+        # to drop everything when a value changes.
+        self._param_cache.clear()
+        self._boolean_param_cache.clear()
+        self._float_param_cache.clear()
+        self._int_param_cache.clear()
 
     @cache
     def _get_specified_style(self):
@@ -180,8 +237,7 @@ class EmbroideryElement(object):
     def has_style(self, style_name):
         return self._get_style_raw(style_name) is not None
 
-    @property
-    @cache
+    @cached_property
     def stroke_scale(self):
         # How wide is the stroke, after the transforms are applied?
         #
@@ -193,36 +249,36 @@ class EmbroideryElement(object):
         # Of course, transforms may also involve rotation, skewing, and translation.
         # All except translation can affect how wide the stroke appears on the screen.
 
-        node_transform = inkex.transforms.Transform(get_node_transform(self.node))
+        node_transform = get_node_transform(self.node)
 
-        # First, figure out the translation component of the transform.  Using a zero
-        # vector completely cancels out the rotation, scale, and skew components.
-        zero = [0, 0]
-        zero = inkex.Transform.apply_to_point(node_transform, zero)
-        translate = Point(*zero)
-
-        # Next, see how the transform affects unit vectors in the X and Y axes.  We
-        # need to subtract off the translation or it will affect the magnitude of
-        # the resulting vector, which we don't want.
-        unit_x = [1, 0]
-        unit_x = inkex.Transform.apply_to_point(node_transform, unit_x)
-        sx = (Point(*unit_x) - translate).length()
-
-        unit_y = [0, 1]
-        unit_y = inkex.Transform.apply_to_point(node_transform, unit_y)
-        sy = (Point(*unit_y) - translate).length()
+        # See how the transform affects unit vectors in the X and Y axes.  The
+        # translation component doesn't affect the magnitude of the resulting
+        # vectors, so we can read the scaled unit vectors straight from the
+        # columns of the matrix:
+        #
+        #   ((a, c, e),
+        #    (b, d, f))
+        matrix = node_transform.matrix
+        sx = math.hypot(matrix[0][0], matrix[1][0])
+        sy = math.hypot(matrix[0][1], matrix[1][1])
 
         # Take the average as a best guess.
         node_scale = (sx + sy) / 2.0
 
         return node_scale
 
-    @property
-    @cache
+    @cached_property
     def stroke_width(self):
         width = self.get_style("stroke-width", "1.0")
-        width = convert_length(width)
-        return width * self.stroke_scale
+        try:
+            # unitless widths are the common case and already in px
+            value = float(width)
+        except (TypeError, ValueError):
+            value = None
+        if value is None or not math.isfinite(value):
+            # float() accepts "inf" and "nan", leave those to convert_length()
+            value = convert_length(width)
+        return value * self.stroke_scale
 
     @property
     @param('ties',
@@ -234,7 +290,6 @@ class EmbroideryElement(object):
            options=[_("Both"), _("Before"), _("After"), _("Neither")],
            default=0,
            sort_index=50)
-    @cache
     def ties(self):
         return self.get_int_param("ties", 0)
 
@@ -246,7 +301,6 @@ class EmbroideryElement(object):
            type='boolean',
            default=False,
            sort_index=51)
-    @cache
     def force_lock_stitches(self):
         return self.get_boolean_param('force_lock_stitches', False)
 
@@ -279,7 +333,10 @@ class EmbroideryElement(object):
         # In a path, each element in the 3-tuple is itself a tuple of (x, y).
         # Tuples all the way down.  Hasn't anyone heard of using classes?
 
-        if getattr(self.node, "get_path", None):
+        if isinstance(self.node, inkex.PathElement):
+            # get_path() would return d as a parsed Path, which then gets copied
+            d = self.node.get("d", "")
+        elif getattr(self.node, "get_path", None):
             d = self.node.get_path()
         else:
             d = self.node.get("d", "")
@@ -287,14 +344,34 @@ class EmbroideryElement(object):
         if not d:
             self.fatal(_("Object %(id)s has an empty 'd' attribute.  Please delete this object from your document.") % dict(id=self.node.get("id")))
 
-        return inkex.paths.Path(d).to_superpath()
+        if not isinstance(d, str):
+            return inkex.paths.Path(d).to_superpath()
+
+        path = _PATH_CACHE.get(d)
+        if path is None:
+            path = inkex.paths.Path(d).to_superpath()
+            _PATH_CACHE[d] = path
+            if len(_PATH_CACHE) > _PATH_CACHE_SIZE:
+                _PATH_CACHE.popitem(last=False)
+        else:
+            _PATH_CACHE.move_to_end(d)
+
+        # Callers may modify the path (see Flip), so they get their own copy.
+        return self._copy_superpath(path)
+
+    def _copy_superpath(self, superpath):
+        # Copying the lists (down to the (x, y) points) is still much cheaper
+        # than parsing d again, and than deepcopy().  copy() keeps the type
+        # and the state of the CubicSuperPath.
+        path = copy(superpath)
+        path[:] = [[[point[:] for point in csp_point] for csp_point in subpath] for subpath in superpath]
+        return path
 
     @cache
     def parse_path(self):
         return apply_transforms(self.path, self.node)
 
-    @property
-    @cache
+    @cached_property
     def paths(self):
         return self.flatten(self.parse_path())
 
@@ -302,22 +379,25 @@ class EmbroideryElement(object):
     def shape(self):
         raise NotImplementedError("INTERNAL ERROR: %s must implement shape()", self.__class__)
 
-    @property
-    @cache
+    @cached_property
     def commands(self):
         return find_commands(self.node)
 
-    @cache
+    @cached_property
+    def _commands_by_name(self):
+        commands_by_name = {}
+        for command in self.commands:
+            commands_by_name.setdefault(command.command, []).append(command)
+        return commands_by_name
+
     def get_commands(self, command):
-        return [c for c in self.commands if c.command == command]
+        return self._commands_by_name.get(command, [])
 
-    @cache
     def has_command(self, command):
-        return len(self.get_commands(command)) > 0
+        return command in self._commands_by_name
 
-    @cache
     def get_command(self, command):
-        commands = self.get_commands(command)
+        commands = self._commands_by_name.get(command)
 
         if commands:
             return commands[0]
@@ -325,18 +405,32 @@ class EmbroideryElement(object):
             return None
 
     def strip_control_points(self, subpath):
-        return [point for control_before, point, control_after in subpath]
+        # This runs over every point of every flattened path, so let map()
+        # do the unpacking in C instead of a list comprehension.
+        return list(map(_csp_point, subpath))
+
+    def _copy_subpath(self, subpath):
+        # cspsubdiv() inserts new control point triples and reassigns the
+        # handles inside existing ones, but it never modifies an (x, y)
+        # point in place.  Copying the two outer list levels is enough and
+        # much cheaper than deepcopy().
+        return [list(csp_point) for csp_point in subpath]
+
+    def _is_straight(self, subpath):
+        # A straight segment has its handles on its endpoints (see path()).
+        # If all segments are straight there's nothing to subdivide.
+        return all(control_before == point == control_after for control_before, point, control_after in subpath)
 
     def flatten(self, path):
         """approximate a path containing beziers with a series of points"""
 
-        path = deepcopy(path)
-        bezier.cspsubdiv(path, 0.1)
-
-        return [self.strip_control_points(subpath) for subpath in path]
+        return [self.flatten_subpath(subpath) for subpath in path]
 
     def flatten_subpath(self, subpath):
-        path = [deepcopy(subpath)]
+        if self._is_straight(subpath):
+            return self.strip_control_points(subpath)
+
+        path = [self._copy_subpath(subpath)]
         bezier.cspsubdiv(path, 0.1)
 
         return self.strip_control_points(path[0])
@@ -417,15 +511,13 @@ class EmbroideryElement(object):
         return []
 
     def is_valid(self):
-        # We have to iterate since it could be a generator.
-        for error in self.validation_errors():
-            return False
-
-        return True
+        # validation_errors() could be a generator, only ask for the first error
+        return next(iter(self.validation_errors()), None) is None
 
     def validate(self):
         """Print an error message and exit if this Element is invalid."""
 
-        for error in self.validation_errors():
-            # note that self.fatal() exits, so this only shows the first error
+        # we only show the first error, so don't look for more
+        error = next(iter(self.validation_errors()), None)
+        if error is not None:
             self.fatal(error.description, True)
@@ -3,12 +3,14 @@
 # Copyright (c) 2010 Authors
 # Licensed under the GNU GPL version 3.0 or later.  See the file LICENSE for details.
 
+import math
 from copy import deepcopy
 from itertools import chain
 import numpy as np
 
 from shapely import geometry as shgeo
 from shapely.ops import nearest_points
+from shapely.strtree import STRtree
 
 from inkex import paths
 
@@ -305,27 +307,48 @@ class SatinColumn(EmbroideryElement):
     def csp(self):
         return self.parse_path()
 
+    @property
+    @cache
+    def _flattened_subpaths(self):
+        """Every subpath of the csp, flattened to a point list, by csp index."""
+        return tuple(self.flatten_subpath(subpath) for subpath in self.csp)
+
+    @property
+    @cache
+    def _rail_csp_indices(self):
+        """The csp indices of the rails, in the same order as self.rails."""
+        indices = [i for i in range(len(self.csp)) if i in self.rail_indices]
+        if len(indices) == 2 and self.swap_rails:
+            indices.reverse()
+        return indices
+
     @property
     @cache
     def rails(self):
         """The rails in order, as point lists"""
-        rails = [subpath for i, subpath in enumerate(self.csp) if i in self.rail_indices]
-        if len(rails) == 2 and self.swap_rails:
-            return [rails[1], rails[0]]
-        else:
-            return rails
+        return [self.csp[i] for i in self._rail_csp_indices]
 
     @property
     @cache
     def flattened_rails(self):
         """The rails, as LineStrings."""
-        return tuple(shgeo.LineString(self.flatten_subpath(rail)) for rail in self.rails)
+        return tuple(shgeo.LineString(self._flattened_subpaths[i]) for i in self._rail_csp_indices)
+
+    @property
+    @cache
+    def _flattened_rung_points(self):
+        """The rungs, flattened to point lists."""
+        if len(self.csp) == 2:
+            # synthesized rungs aren't part of the csp
+            return [self.flatten_subpath(rung) for rung in self.rungs]
+        else:
+            return [self._flattened_subpaths[i] for i in range(len(self.csp)) if i not in self.rail_indices]
 
     @property
     @cache
     def flattened_rungs(self):
         """The rungs, as LineStrings."""
-        return tuple(shgeo.LineString(self.flatten_subpath(rung)) for rung in self.rungs)
+        return tuple(shgeo.LineString(rung) for rung in self._flattened_rung_points)
 
     @property
     @cache
@@ -367,8 +390,7 @@ class SatinColumn(EmbroideryElement):
     @property
     @cache
     def rail_indices(self):
-        paths = [self.flatten_subpath(subpath) for subpath in self.csp]
-        paths = [shgeo.LineString(path) for path in paths]
+        paths = [shgeo.LineString(path) for path in self._flattened_subpaths]
         num_paths = len(paths)
 
         # Imagine a satin column as a curvy ladder.
@@ -385,9 +407,12 @@ class SatinColumn(EmbroideryElement):
             # old-style satin column with no rungs
             return list(range(num_paths))
 
+        # The STRtree gives us the paths whose bounding boxes overlap, so
+        # that we only need to test those for an actual intersection.
         # This takes advantage of the fact that sum() counts True as 1
-        intersection_counts = [sum(paths[i].intersects(paths[j]) for j in range(num_paths) if i != j)
-                               for i in range(num_paths)]
+        strtree = STRtree(paths)
+        intersection_counts = [sum(path.intersects(other) for other in strtree.query(path) if other is not path)
+                               for path in paths]
         paths_not_intersecting_two = [i for i in range(num_paths) if intersection_counts[i] != 2]
         num_not_intersecting_two = len(paths_not_intersecting_two)
 
@@ -453,27 +478,34 @@ class SatinColumn(EmbroideryElement):
     def validation_warnings(self):
         for rung in self.flattened_rungs:
             for rail in self.flattened_rails:
-                intersection = rung.intersection(rail)
-                if intersection.is_empty:
+                # a predicate is much cheaper than building the intersection
+                if not rung.intersects(rail):
                     yield DanglingRungWarning(rung.interpolate(0.5, normalized=True))
 
     def validation_errors(self):
         # The node should have exactly two paths with the same number of points - or it should
         # have two rails and at least one rung
 
+        found_error = False
+
         if len(self.rails) < 2:
+            found_error = True
             yield TooFewPathsError(self.shape.centroid)
         elif len(self.csp) == 2:
             if len(self.rails[0]) != len(self.rails[1]):
+                found_error = True
                 yield UnequalPointsError(self.flattened_rails[0].interpolate(0.5, normalized=True))
         else:
             for rung in self.flattened_rungs:
                 for rail in self.flattened_rails:
                     intersection = rung.intersection(rail)
                     if not intersection.is_empty and not isinstance(intersection, shgeo.Point):
+                        found_error = True
                         yield TooManyIntersectionsError(rung.interpolate(0.5, normalized=True))
 
-        if not self.to_stitch_groups():
+        # Generating the stitches is expensive, and there's no point in it if
+        # we already know that the satin is broken.
+        if not found_error and not self.to_stitch_groups():
             yield NotStitchableError(self.shape.centroid)
 
     def _center_walk_is_odd(self):
@@ -488,14 +520,13 @@ class SatinColumn(EmbroideryElement):
         # flatten the path because you can't just reverse a CSP subpath's elements (I think)
         point_lists = []
 
-        for rail in self.rails:
-            point_lists.append(list(reversed(self.flatten_subpath(rail))))
+        for i in self._rail_csp_indices:
+            point_lists.append(list(reversed(self._flattened_subpaths[i])))
 
         # reverse the order of the rails because we're sewing in the opposite direction
         point_lists.reverse()
 
-        for rung in self.rungs:
-            point_lists.append(self.flatten_subpath(rung))
+        point_lists.extend(self._flattened_rung_points)
 
         return self._csp_to_satin(point_lists_to_csp(point_lists))
 
@@ -544,23 +575,31 @@ class SatinColumn(EmbroideryElement):
           cut points.
         """
 
-        # like in do_satin()
-        points = list(chain.from_iterable(zip(*self.plot_points_on_rails(self.zigzag_spacing))))
+        pairs = self.plot_points_on_rails(self.zigzag_spacing)
 
         if isinstance(split_point, float):
-            index_of_closest_stitch = int(round(len(points) * split_point))
-        else:
-            split_point = Point(*split_point)
-            index_of_closest_stitch = min(list(range(len(points))), key=lambda index: split_point.distance(points[index]))
-
-        if index_of_closest_stitch % 2 == 0:
-            # split point is on the first rail
-            return (points[index_of_closest_stitch],
-                    points[index_of_closest_stitch + 1])
-        else:
-            # split point is on the second rail
-            return (points[index_of_closest_stitch - 1],
-                    points[index_of_closest_stitch])
+            # The stitches alternate between the rails like in do_satin(), so
+            # stitch number i is in pair number i // 2.  No need to build the
+            # list of stitches to find it.
+            index_of_closest_stitch = int(round(2 * len(pairs[0]) * split_point))
+            pair = index_of_closest_stitch // 2
+            return (pairs[0][pair], pairs[1][pair])
+
+        # Interleave the stitches from both rails like in do_satin(), and
+        # find the closest one in one vectorized pass.
+        num_pairs = min(len(pairs[0]), len(pairs[1]))
+        coords = np.empty((2 * num_pairs, 2), dtype=float)
+        coords[0::2] = [(point.x, point.y) for point in pairs[0][:num_pairs]]
+        coords[1::2] = [(point.x, point.y) for point in pairs[1][:num_pairs]]
+
+        split_point = Point(*split_point)
+        distances = np.sum((coords - (split_point.x, split_point.y)) ** 2, axis=1)
+        index_of_closest_stitch = int(np.argmin(distances))
+
+        # Whichever rail the split point is on, the cut points are the pair
+        # that the closest stitch belongs to.
+        pair = index_of_closest_stitch // 2
+        return (pairs[0][pair], pairs[1][pair])
 
     def _cut_rails(self, cut_points):
         """Cut the rails of this satin at the specified points.
@@ -572,7 +611,7 @@ class SatinColumn(EmbroideryElement):
           rails.  Each element is a list of two rails of type LineString.
         """
 
-        rails = [shgeo.LineString(self.flatten_subpath(rail)) for rail in self.rails]
+        rails = self.flattened_rails
 
         path_lists = [[], []]
 
@@ -589,7 +628,7 @@ class SatinColumn(EmbroideryElement):
         Each rung is appended to the correct one of the two new satin columns.
         """
 
-        rungs = [shgeo.LineString(self.flatten_subpath(rung)) for rung in self.rungs]
+        rungs = self.flattened_rungs
         for path_list in split_rails:
             path_list.extend(rung for rung in rungs if path_list[0].intersects(rung) and path_list[1].intersects(rung))
 
@@ -636,16 +675,17 @@ class SatinColumn(EmbroideryElement):
         center_walk, _ = self.plot_points_on_rails(self.zigzag_spacing, (0, 0), (-0.5, -0.5))
         return shgeo.LineString(center_walk)
 
-    def offset_points(self, pos1, pos2, offset_px, offset_proportional):
-        # Expand or contract two points about their midpoint.  This is
-        # useful for pull compensation and insetting underlay.
+    def _offset_point_arrays(self, pos1, pos2, offset_px, offset_proportional):
+        # Expand or contract pairs of points about their midpoints.  This is
+        # useful for pull compensation and insetting underlay.  The pairs are
+        # given as two (N, 2) arrays, so that all of them are offset at once.
 
-        distance = (pos1 - pos2).length()
+        delta = pos1 - pos2
+        distance = np.sqrt(np.sum(delta ** 2, axis=1))
 
-        if distance < 0.0001:
-            # if they're the same point, we don't know which direction
-            # to offset in, so we have to just return the points
-            return pos1, pos2
+        # if they're the same point, we don't know which direction
+        # to offset in, so we have to just return the points
+        same = distance < 0.0001
 
         # calculate the offset for each side
         offset_a = offset_px[0] + (distance * offset_proportional[0])
@@ -653,62 +693,48 @@ class SatinColumn(EmbroideryElement):
         offset_total = offset_a + offset_b
 
         # don't contract beyond the midpoint, or we'll start expanding
-        if offset_total < -distance:
-            scale = -distance / offset_total
-            offset_a = offset_a * scale
-            offset_b = offset_b * scale
+        too_far = offset_total < -distance
+        scale = np.ones_like(distance)
+        np.divide(-distance, offset_total, out=scale, where=too_far)
+        offset_a = np.where(same, 0.0, offset_a * scale)
+        offset_b = np.where(same, 0.0, offset_b * scale)
 
-        out1 = pos1 + (pos1 - pos2).unit() * offset_a
-        out2 = pos2 + (pos2 - pos1).unit() * offset_b
+        unit = delta * (1.0 / np.where(same, 1.0, distance))[:, None]
+        out1 = pos1 + unit * offset_a[:, None]
+        out2 = pos2 - unit * offset_b[:, None]
 
         return out1, out2
 
-    def walk(self, path, start_pos, start_index, distance):
-        # Move <distance> pixels along <path>, which is a sequence of line
-        # segments defined by points.
+    def _arc_lengths(self, section):
+        """Return the section as an array of coordinates and the distance
+        traveled along the section at each of its points."""
 
-        # <start_index> is the index of the line segment in <path> that
-        # we're currently on.  <start_pos> is where along that line
-        # segment we are.  Return a new position and index.
+        coords = np.array([(point.x, point.y) for point in section], dtype=float)
+        segment_lengths = np.sqrt(np.sum(np.diff(coords, axis=0) ** 2, axis=1))
+        return coords, np.concatenate(([0.0], np.cumsum(segment_lengths)))
 
-        # print >> dbg, "walk", start_pos, start_index, distance
+    def _num_steps_to_end(self, length, step):
+        # Even a zero-length rail takes one step to get to its end.
+        if length == 0:
+            return 1
+        return max(1, int(math.ceil(length / step)))
 
-        pos = start_pos
-        index = start_index
-        last_index = len(path) - 1
-        distance_remaining = distance
+    def _section_steps(self):
+        """Tiny steps along the rails of each section, for plot_points_on_rails().
 
-        while True:
-            if index >= last_index:
-                return pos, index
+        Returns a list with one (start0, start1, steps) tuple per section.
+        steps is None if the first rail of the section has no length.  Otherwise
+        it's (x0, y0, x1, y1, center_distances): arrays of the positions of each
+        step on both rails and how far we went along the centerline at each step.
 
-            segment_end = path[index + 1]
-            segment = segment_end - pos
-            segment_length = segment.length()
-
-            if segment_length > distance_remaining:
-                # our walk ends partway along this segment
-                return pos + segment.unit() * distance_remaining, index
-            else:
-                # our walk goes past the end of this segment, so advance
-                # one point
-                index += 1
-                distance_remaining -= segment_length
-                pos = segment_end
-
-    def plot_points_on_rails(self, spacing, offset_px=(0, 0), offset_proportional=(0, 0)):
-        # Take a section from each rail in turn, and plot out an equal number
-        # of points on both rails.  Return the points plotted. The points will
-        # be contracted or expanded by offset using self.offset_points().
+        There is an entry for every 0.05px of the rails, so this is not cached.
+        """
 
-        def add_pair(pos0, pos1):
-            pos0, pos1 = self.offset_points(pos0, pos1, offset_px, offset_proportional)
-            points[0].append(pos0)
-            points[1].append(pos1)
+        # Note that this is 0.05 pixels, which is around 0.01mm, way
+        # smaller than the resolution of an embroidery machine.
+        step = 0.05
 
-        points = [[], []]
-
-        to_travel = 0
+        section_steps = []
 
         for section0, section1 in self.flattened_sections:
             # Take one section at a time, delineated by the rungs.  For each
@@ -718,66 +744,114 @@ class SatinColumn(EmbroideryElement):
             # further on the outside rail between each stitch than we do
             # on the inside rail.
 
-            pos0 = section0[0]
-            pos1 = section1[0]
-
-            len0 = shgeo.LineString(section0).length
-            len1 = shgeo.LineString(section1).length
-
-            last_index0 = len(section0) - 1
-            last_index1 = len(section1) - 1
+            coords0, lengths0 = self._arc_lengths(section0)
+            coords1, lengths1 = self._arc_lengths(section1)
+            len0 = lengths0[-1]
+            len1 = lengths1[-1]
 
             if len0 == 0:
+                section_steps.append((section0[0], section1[0], None))
                 continue
 
             ratio = len1 / len0
 
-            index0 = 0
-            index1 = 0
-
-            while index0 < last_index0 and index1 < last_index1:
-                # Each iteration of this outer loop is one stitch.  Keep going
-                # until we fall off the end of the section.
-
-                old_center = shgeo.Point(x/2 for x in (pos0 + pos1))
-
-                while to_travel > 0 and index0 < last_index0 and index1 < last_index1:
-                    # In this loop, we inch along each rail a tiny bit per
-                    # iteration.  The goal is to travel the requested spacing
-                    # amount along the _centerline_ between the two rails.
-                    #
-                    # Why not just travel the requested amount along the rails
-                    # themselves?  Imagine a letter V.  The distance we travel
-                    # along the rails themselves is much longer than the distance
-                    # between the horizontal stitches themselves:
-                    #
-                    # \______/
-                    #  \____/
-                    #   \__/
-                    #    \/
-                    #
-                    # For more complicated rail shapes, the distance between each
-                    # stitch will vary as the angles of the rails vary.  The
-                    # easiest way to compensate for this is to just go a tiny bit
-                    # at a time and see how far we went.
-
-                    # Note that this is 0.05 pixels, which is around 0.01mm, way
-                    # smaller than the resolution of an embroidery machine.
-                    pos0, index0 = self.walk(section0, pos0, index0, 0.05)
-                    pos1, index1 = self.walk(section1, pos1, index1, 0.05 * ratio)
-
-                    new_center = shgeo.Point(x/2 for x in (pos0 + pos1))
-                    to_travel -= new_center.distance(old_center)
-                    old_center = new_center
-
-                if to_travel <= 0:
-                    add_pair(pos0, pos1)
-                    to_travel = spacing
+            # We inch along each rail a tiny bit per step.  The goal is to
+            # travel the requested spacing amount along the _centerline_
+            # between the two rails.
+            #
+            # Why not just travel the requested amount along the rails
+            # themselves?  Imagine a letter V.  The distance we travel
+            # along the rails themselves is much longer than the distance
+            # between the horizontal stitches themselves:
+            #
+            # \______/
+            #  \____/
+            #   \__/
+            #    \/
+            #
+            # For more complicated rail shapes, the distance between each
+            # stitch will vary as the angles of the rails vary.  The
+            # easiest way to compensate for this is to just go a tiny bit
+            # at a time and see how far we went.
+            #
+            # Stepping through the rails in Python is slow, so we compute
+            # the positions of all steps at once, until we fall off the end
+            # of either rail.
+            num_steps = min(self._num_steps_to_end(len0, step), self._num_steps_to_end(len1, step * ratio))
+            distances = step * np.arange(num_steps + 1)
+
+            x0 = np.interp(distances, lengths0, coords0[:, 0])
+            y0 = np.interp(distances, lengths0, coords0[:, 1])
+            x1 = np.interp(distances * ratio, lengths1, coords1[:, 0])
+            y1 = np.interp(distances * ratio, lengths1, coords1[:, 1])
+
+            # how far we went along the centerline at each step
+            center_x = (x0 + x1) / 2
+            center_y = (y0 + y1) / 2
+            center_steps = np.sqrt(np.diff(center_x) ** 2 + np.diff(center_y) ** 2)
+            center_distances = np.concatenate(([0.0], np.cumsum(center_steps)))
+
+            steps = (x0, y0, x1, y1, center_distances)
+            section_steps.append((section0[0], section1[0], steps))
+
+        return section_steps
+
+    def plot_points_on_rails(self, spacing, offset_px=(0, 0), offset_proportional=(0, 0)):
+        # Take a section from each rail in turn, and plot out an equal number
+        # of points on both rails.  Return the points plotted. The points will
+        # be contracted or expanded by offset using self._offset_point_arrays().
+
+        points = [[], []]
+
+        to_travel = 0
+
+        for start0, start1, steps in self._section_steps():
+            pos0 = (start0.x, start0.y)
+            pos1 = (start1.x, start1.y)
+
+            if steps is None:
+                continue
+
+            x0, y0, x1, y1, center_distances = steps
+            num_steps = len(center_distances) - 1
+
+            if to_travel <= 0:
+                points[0].append(pos0)
+                points[1].append(pos1)
+                to_travel = spacing
+
+            # Each stitch goes at the first step where we've traveled the
+            # requested spacing along the centerline since the last stitch.
+            index = 0
+            while index < num_steps:
+                target = center_distances[index] + to_travel
+                next_index = index + 1 + np.searchsorted(center_distances[index + 1:], target)
+
+                if next_index > num_steps:
+                    # the next stitch is in the next section
+                    to_travel = target - center_distances[num_steps]
+                    break
+
+                index = next_index
+                points[0].append((x0[index], y0[index]))
+                points[1].append((x1[index], y1[index]))
+                to_travel = spacing
+
+            pos0 = (x0[-1], y0[-1])
+            pos1 = (x1[-1], y1[-1])
 
         if to_travel > 0:
-            add_pair(pos0, pos1)
+            points[0].append(pos0)
+            points[1].append(pos1)
+
+        if not points[0]:
+            return [[], []]
+
+        # offset all of the pairs at once
+        out0, out1 = self._offset_point_arrays(np.array(points[0], dtype=float), np.array(points[1], dtype=float),
+                                               offset_px, offset_proportional)
 
-        return points
+        return [[Point(x, y) for x, y in out0.tolist()], [Point(x, y) for x, y in out1.tolist()]]
 
     def do_contour_underlay(self):
         # "contour walk" underlay: do stitches up one side and down the
@@ -785,9 +859,11 @@ class SatinColumn(EmbroideryElement):
         forward, back = self.plot_points_on_rails(
             self.contour_underlay_stitch_length,
             -self.contour_underlay_inset_px, -self.contour_underlay_inset_percent/100)
-        stitches = (forward + list(reversed(back)))
+        reversed_back = back[::-1]
         if self._center_walk_is_odd():
-            stitches = (list(reversed(back)) + forward)
+            stitches = reversed_back + forward
+        else:
+            stitches = forward + reversed_back
 
         return StitchGroup(
             color=self.color,
@@ -805,12 +881,13 @@ class SatinColumn(EmbroideryElement):
             self.center_walk_underlay_stitch_length,
             (0, 0), inset_prop)
 
+        reversed_back = back[::-1]
         stitches = []
         for i in range(self.center_walk_underlay_repeats):
             if i % 2 == 0:
-                stitches += forward
+                stitches.extend(forward)
             else:
-                stitches += list(reversed(back))
+                stitches.extend(reversed_back)
 
         return StitchGroup(
             color=self.color,
@@ -844,15 +921,12 @@ class SatinColumn(EmbroideryElement):
 
         # This fancy bit of iterable magic just repeatedly takes a point
         # from each side in turn.
-        last_point = None
-        for point in chain.from_iterable(zip(*sides)):
-            if last_point and self.zigzag_underlay_max_stitch_length:
-                if last_point.distance(point) > self.zigzag_underlay_max_stitch_length:
-                    points, count = self._get_split_points(last_point, point, self.zigzag_underlay_max_stitch_length)
-                    for point in points:
-                        patch.add_stitch(point)
-            last_point = point
-            patch.add_stitch(point)
+        points = list(chain.from_iterable(zip(*sides)))
+
+        if self.zigzag_underlay_max_stitch_length and len(points) > 1:
+            points = self._split_long_stitches(points, self.zigzag_underlay_max_stitch_length)
+
+        patch.add_stitches(points)
 
         patch.add_tags(("satin_column", "satin_column_underlay", "satin_zigzag_underlay"))
         return patch
@@ -884,8 +958,7 @@ class SatinColumn(EmbroideryElement):
             self._do_short_stitches(sides)
 
         # Like in zigzag_underlay(): take a point from each side in turn.
-        for point in chain.from_iterable(zip(*sides)):
-            patch.add_stitch(point)
+        patch.add_stitches(chain.from_iterable(zip(*sides)))
 
         if self._center_walk_is_odd():
             patch.stitches = list(reversed(patch.stitches))
@@ -911,10 +984,7 @@ class SatinColumn(EmbroideryElement):
 
         # "left" and "right" here are kind of arbitrary designations meaning
         # a point from the first and second rail respectively
-        for left, right in zip(*sides):
-            patch.add_stitch(left)
-            patch.add_stitch(right)
-            patch.add_stitch(left)
+        patch.add_stitches(chain.from_iterable((left, right, left) for left, right in zip(*sides)))
 
         if self._center_walk_is_odd():
             patch.stitches = list(reversed(patch.stitches))
@@ -946,28 +1016,63 @@ class SatinColumn(EmbroideryElement):
         return patch
 
     def _get_split_points(self, left, right, max_stitch_length, count=None):
-        points = []
         distance = left.distance(right)
-        split_count = count or int(-(-distance // max_stitch_length))
+        if distance < 0.0001:
+            # Rails contracted to their midpoint only differ by rounding
+            # errors, don't add zero-length split stitches there.
+            distance = 0
+        split_count = count or math.ceil(distance / max_stitch_length)
+        # evenly spaced points along the straight line from left to right
+        dx = right.x - left.x
+        dy = right.y - left.y
+        points = []
         for i in range(split_count):
-            line = shgeo.LineString((left, right))
-            split_point = line.interpolate((i+1)/split_count, normalized=True)
-            points.append(Point(split_point.x, split_point.y))
+            fraction = (i + 1) / split_count
+            points.append(Point(left.x + dx * fraction, left.y + dy * fraction))
         return [points, split_count]
 
+    def _split_long_stitches(self, points, max_stitch_length):
+        # Before each point that's too far away from the previous one, add
+        # the points from _get_split_points() for that stitch.  All of the
+        # stitches are measured and split at once.
+        coords = np.array([(point.x, point.y) for point in points], dtype=float)
+        deltas = np.diff(coords, axis=0)
+        lengths = np.sqrt(np.sum(deltas ** 2, axis=1))
+        counts = np.where(lengths > max_stitch_length, np.ceil(lengths / max_stitch_length), 0).astype(int)
+
+        stitch_index = np.repeat(np.arange(len(deltas)), counts)
+        first_split = np.cumsum(counts) - counts
+        split_number = np.arange(len(stitch_index)) - np.repeat(first_split, counts) + 1
+        fractions = split_number / np.repeat(counts, counts)
+        split_coords = coords[stitch_index] + deltas[stitch_index] * fractions[:, None]
+        split_points = [Point(x, y) for x, y in split_coords.tolist()]
+
+        new_points = [points[0]]
+        for point, start, count in zip(points[1:], first_split.tolist(), counts.tolist()):
+            new_points.extend(split_points[start:start + count])
+            new_points.append(point)
+
+        return new_points
+
     def _do_short_stitches(self, sides):
-        for i, (left, right) in enumerate(zip(*sides)):
-            if i % 2 == 0:
-                continue
-            if left.distance(sides[0][i-1]) < self.short_stitch_distance:
-                split_point = self._get_inset_point(left, right, self.short_stitch_inset)
-                sides[0][i] = Point(split_point.x, split_point.y)
-            if right.distance(sides[1][i-1]) < self.short_stitch_distance:
-                split_point = self._get_inset_point(right, left, self.short_stitch_inset)
-                sides[1][i] = Point(split_point.x, split_point.y)
-
-    def _get_inset_point(self, point1, point2, distance_fraction):
-        return point1 * (1 - distance_fraction) + point2 * distance_fraction
+        # Only the stitches at odd indices get shortened, and they're always
+        # compared to the (unchanged) stitch before them, so all of them can
+        # be checked at once.
+        num_points = min(len(sides[0]), len(sides[1]))
+        if num_points < 2:
+            return
+
+        left = np.array([(point.x, point.y) for point in sides[0][:num_points]], dtype=float)
+        right = np.array([(point.x, point.y) for point in sides[1][:num_points]], dtype=float)
+        odd = np.arange(1, num_points, 2)
+        inset = self.short_stitch_inset
+
+        for side, this_side, other_side in ((0, left, right), (1, right, left)):
+            distances = np.sqrt(np.sum((this_side[odd] - this_side[odd - 1]) ** 2, axis=1))
+            short = odd[distances < self.short_stitch_distance]
+            inset_points = this_side[short] * (1 - inset) + other_side[short] * inset
+            for i, (x, y) in zip(short.tolist(), inset_points.tolist()):
+                sides[side][i] = Point(x, y)
 
     def to_stitch_groups(self, last_patch=None):
         # Stitch a variable-width satin column, zig-zagging between two paths.
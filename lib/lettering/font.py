@@ -6,6 +6,7 @@
 import json
 import os
 from copy import deepcopy
+from functools import cached_property
 from random import randint
 
 import inkex
@@ -74,17 +75,16 @@ class Font(object):
       metadata -- A dict of information about the font.
       name     -- Shortcut property for metadata["name"]
       license  -- contents of the font's LICENSE file, or None if no LICENSE file exists.
-      variants -- A dict of FontVariants, with keys in FontVariant.VARIANT_TYPES.
+      variants -- A dict of the FontVariants loaded so far, with keys in FontVariant.VARIANT_TYPES.
+                  Use get_variant() to load and fetch one.
     """
 
     def __init__(self, font_path):
         self.path = font_path
         self.metadata = {}
-        self.license = None
         self.variants = {}
 
         self._load_metadata()
-        self._load_license()
 
     def _load_metadata(self):
         try:
@@ -93,21 +93,24 @@ class Font(object):
         except IOError:
             pass
 
-    def _load_license(self):
+    @cached_property
+    def license(self):
+        # only read when someone asks for it, not for every font in the lettering dialog
         try:
             with open(os.path.join(self.path, "LICENSE"), encoding="utf-8-sig") as license_file:
-                self.license = license_file.read()
+                return license_file.read()
         except IOError:
-            pass
-
-    def _load_variants(self):
-        if not self.variants:
-            for variant in FontVariant.VARIANT_TYPES:
-                try:
-                    self.variants[variant] = FontVariant(self.path, variant, self.default_glyph)
-                except IOError:
-                    # we'll deal with missing variants when we apply lettering
-                    pass
+            return None
+
+    def _load_variant(self, variant):
+        # Variants are loaded when they're first used, because parsing a variant's
+        # SVG file is expensive and most renderings only need one or two of them.
+        if variant not in self.variants and variant in FontVariant.VARIANT_TYPES:
+            try:
+                self.variants[variant] = FontVariant(self.path, variant, self.default_glyph)
+            except IOError:
+                # we'll deal with missing variants when we apply lettering
+                pass
 
     name = localized_font_metadata('name', '')
     description = localized_font_metadata('description', '')
@@ -184,7 +187,6 @@ class Font(object):
     def render_text(self, text, destination_group, variant=None, back_and_forth=True, trim_option=0):
 
         """Render text into an SVG group element."""
-        self._load_variants()
 
         if variant is None:
             variant = self.default_variant
@@ -231,7 +233,12 @@ class Font(object):
         return destination_group
 
     def get_variant(self, variant):
-        return self.variants.get(variant, self.variants[self.default_variant])
+        self._load_variant(variant)
+        if variant not in self.variants:
+            variant = self.default_variant
+            self._load_variant(variant)
+
+        return self.variants[variant]
 
     def _render_line(self, line, position, glyph_set):
         """Render a line of text.
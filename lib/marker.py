@@ -5,16 +5,21 @@
 
 from copy import deepcopy
 from os import path
+from weakref import WeakKeyDictionary
 
 from shapely import geometry as shgeo
 
 import inkex
 
-from .svg.tags import EMBROIDERABLE_TAGS
+from .svg.tags import EMBROIDERABLE_TAGS, SVG_GROUP_TAG
 from .utils import cache, get_bundled_dir
 
 MARKER = ['pattern', 'guide-line']
 
+# The markers used in each group, see has_group_marker().  Groups that have
+# been removed from the document drop out on their own.
+_GROUP_MARKERS = WeakKeyDictionary()
+
 
 def ensure_marker(svg, marker):
     marker_path = ".//*[@id='inkstitch-%s-marker']" % marker
@@ -86,3 +91,22 @@ def has_marker(node, marker=list()):
         if "marker-start:url(#inkstitch-%s-marker" % m in style:
             return True
     return False
+
+
+def has_group_marker(node, marker):
+    """Whether the group of node contains elements with this marker.
+
+    This is where get_marker_elements() looks for them, and all elements in a
+    group share the answer, so the children of each group are only checked once.
+    """
+    group = node.getparent()
+    if group is None or group.tag != SVG_GROUP_TAG:
+        return False
+
+    markers = _GROUP_MARKERS.get(group)
+    if markers is None:
+        styles = [child.get('style') or '' for child in group]
+        markers = frozenset(m for m in MARKER if any("marker-start:url(#inkstitch-%s-marker" % m in style for style in styles))
+        _GROUP_MARKERS[group] = markers
+
+    return marker in markers
@@ -5,12 +5,16 @@
 
 from shapely import geometry as shgeo
 
-from .marker import get_marker_elements
+from .marker import get_marker_elements, has_group_marker
 from .stitch_plan import Stitch
 from .utils import Point
 
 
 def apply_patterns(patches, node):
+    if not patches or not has_group_marker(node, "pattern"):
+        # don't bother looking up (and building) pattern elements
+        return
+
     patterns = get_marker_elements(node, "pattern")
     _apply_fill_patterns(patterns['fill'], patches)
     _apply_stroke_patterns(patterns['stroke'], patches)
@@ -44,8 +44,8 @@ class StitchGroup:
         return len(self.stitches)
 
     def add_stitches(self, stitches):
-        for stitch in stitches:
-            self.add_stitch(stitch)
+        # same as add_stitch() for each one, but in a single extend()
+        self.stitches.extend(stitch if isinstance(stitch, Stitch) else Stitch(stitch) for stitch in stitches)
 
     def add_stitch(self, stitch):
         if not isinstance(stitch, Stitch):
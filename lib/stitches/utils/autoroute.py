@@ -3,11 +3,13 @@
 # Copyright (c) 2010 Authors
 # Licensed under the GNU GPL version 3.0 or later.  See the file LICENSE for details.
 
+from collections import defaultdict
 from itertools import combinations
 
 import networkx as nx
-from shapely.geometry import Point, MultiPoint
-from shapely.ops import nearest_points
+import numpy as np
+from scipy.spatial import KDTree
+from shapely.geometry import Point
 
 import inkex
 
@@ -29,7 +31,7 @@ def find_path(graph, starting_node, ending_node):
     #
     # Visiting the edges again on the way back allows us to set up
     # "underpathing".
-    path = nx.shortest_path(graph, starting_node, ending_node)
+    path = nx.bidirectional_shortest_path(graph, starting_node, ending_node)
 
     # Copy the graph so that we can remove the edges as we visit them.
     # This also converts the directed graph into an undirected graph in the
@@ -44,30 +46,41 @@ def find_path(graph, starting_node, ending_node):
             final_path.append((prev, node))
         prev = node
 
-        for n1, n2, edge_type in list(nx.dfs_labeled_edges(graph, node)):
-            if n1 == n2:
-                # dfs_labeled_edges gives us (start, start, "forward") for
-                # the starting node for some reason
+        # This is a depth-first search like nx.dfs_labeled_edges(), but we
+        # remove the edges from the graph as we go instead of building the
+        # complete list of labeled edges first.
+        visited = {node}
+        stack = [(node, iter(list(graph[node])))]
+        while stack:
+            parent, neighbors = stack[-1]
+            child = next(neighbors, None)
+
+            if child is None:
+                # dead end: back-track, sewing the edge again
+                stack.pop()
+                if stack:
+                    final_path.append((parent, stack[-1][0]))
+            elif child == parent:
+                # Skip self-loops like nx.dfs_labeled_edges() does.  add_jumps()
+                # adds a zero-length jump like this between elements that touch.
                 continue
-
-            if edge_type == "forward":
-                final_path.append((n1, n2))
-                graph.remove_edge(n1, n2)
-            elif edge_type == "reverse":
-                final_path.append((n2, n1))
-            elif edge_type == "nontree":
-                # a "nontree" happens when there exists an edge from n1 to n2
-                # but n2 has already been visited.  It's a dead-end that runs
-                # into part of the graph that we've already traversed.  We
-                # do still need to make sure that edge is sewn, so we travel
-                # down and back on this edge.
+            elif child not in visited:
+                final_path.append((parent, child))
+                graph.remove_edge(parent, child)
+                visited.add(child)
+                stack.append((child, iter(list(graph[child]))))
+            elif graph.has_edge(parent, child):
+                # This happens when there exists an edge from parent to child
+                # but child has already been visited.  It's a dead-end that
+                # runs into part of the graph that we've already traversed.
+                # We do still need to make sure that edge is sewn, so we
+                # travel down and back on this edge.
                 #
-                # It's possible for a given "nontree" edge to be listed more
-                # than once so we'll deduplicate.
-                if (n1, n2) in graph.edges:
-                    final_path.append((n1, n2))
-                    final_path.append((n2, n1))
-                    graph.remove_edge(n1, n2)
+                # It's possible to reach a given edge like this from both
+                # ends, so we remove it to deduplicate.
+                final_path.append((parent, child))
+                final_path.append((child, parent))
+                graph.remove_edge(parent, child)
 
     return final_path
 
@@ -84,21 +97,19 @@ def add_jumps(graph, elements, preserve_order):
         # stitch between them and add it.  The directions of these new edges
         # will enforce stitching the elements in order.
 
-        for element1, element2 in zip(elements[:-1], elements[1:]):
-            potential_edges = []
-
-            nodes1 = get_nodes_on_element(graph, element1)
-            nodes2 = get_nodes_on_element(graph, element2)
-
-            for node1 in nodes1:
-                for node2 in nodes2:
-                    point1 = graph.nodes[node1]['point']
-                    point2 = graph.nodes[node2]['point']
-                    potential_edges.append((point1, point2))
+        nodes_by_element = get_nodes_by_element(graph)
 
-            if potential_edges:
-                edge = min(potential_edges, key=lambda p1_p2: p1_p2[0].distance(p1_p2[1]))
-                graph.add_edge(str(edge[0]), str(edge[1]), jump=True)
+        for element1, element2 in zip(elements[:-1], elements[1:]):
+            nodes1 = list(nodes_by_element[element1])
+            nodes2 = list(nodes_by_element[element2])
+
+            if nodes1 and nodes2:
+                # like in possible_jumps()
+                points1 = get_node_coordinates(graph, nodes1)
+                points2 = get_node_coordinates(graph, nodes2)
+                distances, indices = KDTree(points2).query(points1)
+                closest = int(np.argmin(distances))
+                graph.add_edge(nodes1[closest], nodes2[indices[closest]], jump=True)
     else:
         # networkx makes this super-easy!  k_edge_agumentation tells us what edges
         # we need to add to ensure that the graph is fully connected.  We give it a
@@ -117,13 +128,19 @@ def possible_jumps(graph):
     Returns: a generator of tuples: (node1, node2, length)
     """
 
-    for component1, component2 in combinations(nx.connected_components(graph), 2):
-        points1 = MultiPoint([graph.nodes[node]['point'] for node in component1])
-        points2 = MultiPoint([graph.nodes[node]['point'] for node in component2])
+    # Index the points of each component once, rather than comparing every
+    # point with every other point for each pair of components.
+    components = []
+    for component in nx.connected_components(graph):
+        nodes = list(component)
+        points = get_node_coordinates(graph, nodes)
+        components.append((nodes, points, KDTree(points)))
 
-        start_point, end_point = nearest_points(points1, points2)
+    for (nodes1, points1, _), (nodes2, _, tree2) in combinations(components, 2):
+        distances, indices = tree2.query(points1)
+        closest = int(np.argmin(distances))
 
-        yield (str(start_point), str(end_point), start_point.distance(end_point))
+        yield (nodes1[closest], nodes2[indices[closest]], float(distances[closest]))
 
 
 def get_starting_and_ending_nodes(graph, elements, preserve_order, starting_point, ending_point):
@@ -156,11 +173,21 @@ def find_node(graph, point, extreme_function, constrain_to_satin=False, satin=No
     else:
         nodes = graph.nodes()
 
+    nodes = list(nodes)
+    coordinates = get_node_coordinates(graph, nodes)
+
     if point is None:
-        return extreme_function(nodes, key=lambda node: graph.nodes[node]['point'].x)
+        x_coordinates = coordinates[:, 0].tolist()
+        return nodes[extreme_function(range(len(nodes)), key=x_coordinates.__getitem__)]
     else:
         point = Point(*point)
-        return min(nodes, key=lambda node: graph.nodes[node]['point'].distance(point))
+        distances = np.sum((coordinates - (point.x, point.y)) ** 2, axis=1)
+        return nodes[int(np.argmin(distances))]
+
+
+def get_node_coordinates(graph, nodes):
+    """The coordinates of the nodes' points, as an (N, 2) array in the same order."""
+    return np.array([graph.nodes[node]['point'].coords[0] for node in nodes], dtype=float).reshape(-1, 2)
 
 
 def get_nodes_on_element(graph, element):
@@ -174,6 +201,22 @@ def get_nodes_on_element(graph, element):
     return nodes
 
 
+def get_nodes_by_element(graph):
+    """Like get_nodes_on_element(), but for all elements in one pass over the edges.
+
+    Returns: a defaultdict mapping each element to the set of its nodes
+    """
+
+    nodes_by_element = defaultdict(set)
+
+    for start_node, end_node, element_for_edge in graph.edges(data='element'):
+        if element_for_edge is not None:
+            nodes_by_element[element_for_edge].add(start_node)
+            nodes_by_element[element_for_edge].add(end_node)
+
+    return nodes_by_element
+
+
 def remove_original_elements(elements):
     for element in elements:
         for command in element.commands:
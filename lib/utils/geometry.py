@@ -5,6 +5,7 @@
 
 import math
 
+import numpy as np
 from shapely.geometry import LineString, LinearRing, MultiLineString, Polygon, MultiPolygon, MultiPoint, GeometryCollection
 from shapely.geometry import Point as ShapelyPoint
 
@@ -50,24 +51,51 @@ def cut_multiple(line, distances, normalized=False):
     Returns:
         a list of LineStrings or None values"""
 
+    # Measure the line once up front and then cut all of the pieces based on
+    # that, rather than cutting and re-measuring what's left each time.
+    coords = list(line.coords)
+    xy = np.array(coords, dtype=float)
+    traveled = np.concatenate(([0.0], np.cumsum(np.sqrt(np.sum(np.diff(xy, axis=0) ** 2, axis=1)))))
+    length = traveled[-1]
+
+    if normalized:
+        distances = [distance * length for distance in distances]
     distances = list(sorted(distances))
 
-    segments = [line]
-    distance_so_far = 0
+    segments = []
     nones = []
 
-    for distance in distances:
-        segment = segments.pop()
-        before, after = cut(segment, distance - distance_so_far, normalized)
+    # What's left of the line starts at start and continues with
+    # coords[next_index:].  start is None when nothing is left.
+    start = coords[0]
+    start_distance = 0.0
+    next_index = 1
 
-        segments.append(before)
-
-        if after is None:
-            nones.append(after)
+    for distance in distances:
+        if start is None:
+            nones.append(None)
+        elif distance <= start_distance:
+            segments.append(None)
+        elif distance >= length:
+            segments.append(LineString([start] + coords[next_index:]))
+            start = None
+            nones.append(None)
         else:
-            if before is not None:
-                distance_so_far += before.length
-            segments.append(after)
+            i = int(np.searchsorted(traveled, distance))
+            if traveled[i] == distance:
+                segments.append(LineString([start] + coords[next_index:i + 1]))
+                start = coords[i]
+                next_index = i + 1
+            else:
+                fraction = (distance - traveled[i - 1]) / (traveled[i] - traveled[i - 1])
+                cut_point = tuple((xy[i - 1] + fraction * (xy[i] - xy[i - 1])).tolist())
+                segments.append(LineString([start] + coords[next_index:i] + [cut_point]))
+                start = cut_point
+                next_index = i
+            start_distance = distance
+
+    if start is not None:
+        segments.append(LineString([start] + coords[next_index:]))
 
     segments.extend(nones)
     return segments
@@ -0,0 +1,28 @@
+from shapely.geometry import MultiLineString, Point
+
+from lib.stitches.auto_run import build_graph
+from lib.stitches.utils.autoroute import add_jumps, find_path
+
+
+class FakeElement(object):
+    def __init__(self, coords):
+        self.coords = coords
+
+    def as_multi_line_string(self):
+        return MultiLineString([self.coords])
+
+
+def test_find_path_skips_zero_length_jumps():
+    # The elements touch, so the preserve_order jump between them starts
+    # and ends on the same node.
+    elements = [FakeElement([(0, 0), (10, 0)]), FakeElement([(10, 0), (20, 0)])]
+    graph = build_graph(elements, True, False)
+    add_jumps(graph, elements, True)
+
+    touching_node = str(Point(10, 0))
+    assert graph.has_edge(touching_node, touching_node)
+
+    path = find_path(graph, str(Point(0, 0)), str(Point(20, 0)))
+
+    assert path
+    assert not [edge for edge in path if edge[0] == edge[1]]
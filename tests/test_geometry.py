@@ -0,0 +1,46 @@
+from pytest import approx
+from shapely.geometry import LineString
+
+from lib.utils.geometry import cut_multiple
+
+
+def coords(segments):
+    return [None if segment is None else list(segment.coords) for segment in segments]
+
+
+def flat(points):
+    # approx() doesn't compare nested sequences
+    return [coord for point in points for coord in point]
+
+
+def test_cut_multiple():
+    line = LineString([(0, 0), (10, 0), (10, 10)])
+
+    # unsorted, and one of the cuts is right on a vertex
+    segments = cut_multiple(line, [15, 5, 10])
+
+    assert coords(segments) == [[(0, 0), (5, 0)], [(5, 0), (10, 0)], [(10, 0), (10, 5)], [(10, 5), (10, 10)]]
+
+
+def test_cut_multiple_empty_segments():
+    line = LineString([(0, 0), (10, 0), (10, 10)])
+
+    # at the start, duplicated, at the end and beyond the end
+    segments = cut_multiple(line, [0, 5, 5, 20, 25])
+
+    assert coords(segments) == [None, [(0, 0), (5, 0)], None, [(5, 0), (10, 0), (10, 10)], None, None]
+
+
+def test_cut_multiple_sliver_at_end_is_none():
+    # A rail ending in a duplicated point, cut at its whole length.  Cutting
+    # one piece after the other used to leave a zero-length LineString
+    # [(1.6, 1.9), (1.6, 1.9), (1.6, 1.9)] at the end, because of the
+    # rounding errors of measuring the rest of the line again for each cut.
+    line = LineString([(1.2, 1.2), (1.6, 1.9), (1.6, 1.9)])
+
+    segments = cut_multiple(line, [0.4120069990774568, 0.7940192441245779, line.length])
+
+    assert segments[-1] is None
+    assert flat(segments[0].coords) == approx(flat([(1.2, 1.2), (1.4044127151178745, 1.5577222514562803)]))
+    assert flat(segments[1].coords) == approx(flat([(1.4044127151178745, 1.5577222514562803), (1.5939438648148638, 1.8894017634260114)]))
+    assert flat(segments[2].coords) == approx(flat([(1.5939438648148638, 1.8894017634260114), (1.6, 1.9), (1.6, 1.9)]))
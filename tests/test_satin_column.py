@@ -0,0 +1,80 @@
+from io import StringIO
+
+import inkex
+import pytest
+from pytest import approx
+
+from lib.elements import SatinColumn
+from lib.utils import Point
+
+# The expected values below are the results of the original implementation,
+# which stepped along the rails one point at a time.  The spacings are chosen
+# so that no stitch lands within rounding errors of a step boundary.
+
+
+def satin(d, **params):
+    svg = inkex.load_svg(StringIO('<svg xmlns="http://www.w3.org/2000/svg" xmlns:inkstitch="http://inkstitch.org/namespace"></svg>')).getroot()
+    node = inkex.PathElement(d=d)
+    node.set('style', 'fill:none;stroke:#000000;stroke-width:1')
+    node.set('inkstitch:satin_column', 'true')
+    for name, value in params.items():
+        node.set('inkstitch:' + name, value)
+    svg.append(node)
+    return SatinColumn(node)
+
+
+def flat(points):
+    # approx() doesn't compare nested sequences
+    return [coord for point in points for coord in point]
+
+
+def xy(points):
+    return flat((point.x, point.y) for point in points)
+
+
+@pytest.mark.parametrize("d, spacing, offset_px, offset_proportional, count, end0, end1", [
+    # straight rails of different lengths
+    ("M 0,0 L 10.013,0.7 M 0.3,5 L 10.5,5.9", 0.73, (0, 0), (0, 0), 15,
+     [(9.726261, 0.679954), (10.013, 0.7)], [(10.207906, 5.874227), (10.5, 5.9)]),
+    # a V, where the centerline is much shorter than the rails
+    ("M 0,0 L 5.1,10.3 L 10.2,0.1 M 2.05,0.2 L 5,6.1 L 8.13,0", 1.07, (0, 0), (0, 0), 18,
+     [(9.795743, 0.908514), (10.2, 0.1)], [(7.881897, 0.483523), (8.13, 0.0)]),
+    # two sections, split by a rung
+    ("M 0,0 L 10.3,0.2 M 0.1,5 L 10.4,5.3 M 5.1,-1 L 5.2,6.2", 2.23, (0, 0), (0, 0), 6,
+     [(9.014533, 0.175039), (10.3, 0.2)], [(9.107126, 5.262343), (10.4, 5.3)]),
+    # curves, with offsets
+    ("M 0,0 C 3,2 7,2 10,0 M 0,5 C 3,7.5 7,7.5 10,5", 0.61, (0.3, 0.3), (-0.1, -0.1), 18,
+     [(9.841096, 0.291259), (10.0, 0.2)], [(9.846124, 4.906068), (10.0, 4.8)]),
+])
+def test_plot_points_on_rails(d, spacing, offset_px, offset_proportional, count, end0, end1):
+    rail0, rail1 = satin(d).plot_points_on_rails(spacing, offset_px, offset_proportional)
+
+    # the last stitch before the end of the rails, and the end itself
+    assert len(rail0) == len(rail1) == count
+    assert xy(rail0[-2:]) == approx(flat(end0), abs=1e-6)
+    assert xy(rail1[-2:]) == approx(flat(end1), abs=1e-6)
+
+
+@pytest.mark.parametrize("left, right, max_stitch_length, count, expected_count, expected_points", [
+    ((0, 0), (10, 0), 3, None, 4, [(2.5, 0), (5, 0), (7.5, 0), (10, 0)]),
+    ((0, 0), (3, 4), 2, None, 3, [(1, 4 / 3), (2, 8 / 3), (3, 4)]),
+    # the way back is split into as many parts as the way there
+    ((0, 0), (3, 4), 10, 3, 3, [(1, 4 / 3), (2, 8 / 3), (3, 4)]),
+    ((1, 1), (1, 1), 3, None, 0, []),
+    # Rails contracted to their midpoint differ by rounding errors only.
+    # This used to add a zero-length split stitch.
+    ((1, 1), (1 + 1e-13, 1), 3, None, 0, []),
+])
+def test_get_split_points(left, right, max_stitch_length, count, expected_count, expected_points):
+    points, split_count = satin("M 0,0 L 10,0 M 0,5 L 10,5")._get_split_points(Point(*left), Point(*right), max_stitch_length, count)
+
+    assert split_count == expected_count
+    assert xy(points) == approx(flat(expected_points))
+
+
+def test_do_satin_split_stitches():
+    stitches = satin("M 0,0 L 10.1,0.3 M 0.2,25 L 10.3,25.4", max_stitch_length_mm='2', zigzag_spacing_mm='0.83').do_satin().stitches
+
+    assert len(stitches) == 46
+    assert xy(stitches[:7]) == approx(flat([(0, 0), (0.05, 6.25), (0.1, 12.5), (0.15, 18.75), (0.2, 25), (0.2, 25), (0.937153, 18.773381)]), abs=1e-6)
+    assert xy(stitches[-2:]) == approx(flat([(10.3, 25.4), (10.3, 25.4)]), abs=1e-6)